@@ -180,9 +180,12 @@ export const getMLModelInfo = async () => {
 
 /**
  * Train/retrain ML model
+ * Training runs as a background job on the ML service; this polls the job until it finishes.
  * @param {Object} options - Training options
  * @param {number} options.n_samples - Number of synthetic samples (default: 3000)
  * @param {number} options.random_seed - Random seed (default: 42)
+ * @param {number} options.poll_interval_ms - Delay between job status checks (default: 1000)
+ * @param {number} options.max_wait_ms - Give up waiting after this long (default: 300000)
  */
 export const trainMLModel = async (options = {}) => {
   if (!ML_SERVICE_ENABLED) {
@@ -190,19 +193,41 @@ export const trainMLModel = async (options = {}) => {
     return null;
   }
 
+  const pollInterval = options.poll_interval_ms || 1000;
+  const maxWait = options.max_wait_ms || 300000;
+
   try {
-    const response = await mlClient.post('/api/train', {
+    const { data: submitted } = await mlClient.post('/api/train', {
       n_samples: options.n_samples || 3000,
       random_seed: options.random_seed || 42
     });
 
+    logger.info('ML model training started', { jobId: submitted.job_id });
+
+    const deadline = Date.now() + maxWait;
+    let job = submitted;
+    while (job.status === 'pending' || job.status === 'running') {
+      if (Date.now() > deadline) {
+        logger.error('ML model training timed out', { jobId: submitted.job_id });
+        return null;
+      }
+      await new Promise(resolve => setTimeout(resolve, pollInterval));
+      ({ data: job } = await mlClient.get(`/api/train/${submitted.job_id}`));
+    }
+
+    const result = job.result || {};
+    if (job.status !== 'completed') {
+      logger.error('ML model training failed', { jobId: job.job_id, error: result.error });
+      return null;
+    }
+
     logger.info('ML model training completed', {
-      success: response.data.success,
-      mae: response.data.mae,
-      r2: response.data.r2
+      success: result.success,
+      mae: result.mae,
+      r2: result.r2
     });
 
-    return response.data;
+    return result;
   } catch (error) {
     logger.error('ML model training failed', { error: error.message });
     return null;
@@ -3,19 +3,24 @@ FastAPI Application for ML Dispatch Service
 """
 
 import os
+import re
+import asyncio
 import logging
 from pathlib import Path
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, status
+import msgspec
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
-from app.models.dispatch_model import get_model
+from app.models.dispatch_model import DispatchModel, get_model, set_model
 from app.services.training_service import get_training_service
+from app.responses import ORJSONResponse
 from app.schemas.dispatch_schemas import (
-    PredictRequest, PredictResponse, PredictionResult,
-    TrainRequest, TrainResponse,
+    PredictRequest, PredictResponse,
+    TrainRequest, TrainJobResponse,
     HealthResponse, ModelInfoResponse
 )
 
@@ -24,7 +29,7 @@ load_dotenv()
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -33,7 +38,10 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="ML Dispatch Service",
     description="Machine Learning service for intelligent vehicle dispatch decisions",
-    version="1.0.0"
+    version="1.0.0",
+    # Handlers return plain dicts rendered by orjson; the response schemas below
+    # are only attached for the OpenAPI docs, not used to re-validate output
+    default_response_class=ORJSONResponse
 )
 
 # CORS configuration
@@ -50,6 +58,9 @@ MODEL_PATH = os.getenv('MODEL_PATH', None)
 if MODEL_PATH:
     MODEL_PATH = Path(MODEL_PATH)
 
+# How often (seconds) each worker checks whether the model file was retrained elsewhere
+MODEL_RELOAD_INTERVAL = float(os.getenv('MODEL_RELOAD_INTERVAL', 5))
+
 # Initialize model and training service
 model = get_model(str(MODEL_PATH) if MODEL_PATH else None)
 training_service = get_training_service(str(MODEL_PATH) if MODEL_PATH else None)
@@ -61,6 +72,96 @@ if model.load():
 else:
     logger.warning("Model not available on initialization. Use /api/train to generate model.")
 
+def reload_model() -> Optional[str]:
+    """
+    Load the model file into a new instance and swap it in with a single rebind
+    
+    In-flight predictions keep using the old instance. Returns an error message
+    (and keeps the old model, both here and as the global instance) if loading fails.
+    """
+    global model
+    new_model = DispatchModel(str(MODEL_PATH) if MODEL_PATH else None)
+    if not new_model.load():
+        return new_model.error
+    set_model(new_model)
+    model = new_model
+    return None
+
+async def watch_model_file():
+    """Pick up models retrained by other workers (each worker holds its own copy)"""
+    # A file that failed to load is not retried until it is replaced again
+    failed_mtime_ns = None
+    while True:
+        await asyncio.sleep(MODEL_RELOAD_INTERVAL)
+        if not model.is_stale() or training_service.is_training():
+            continue
+        mtime_ns = model.file_mtime_ns()
+        if mtime_ns == failed_mtime_ns:
+            continue
+        error = reload_model()
+        if error:
+            failed_mtime_ns = mtime_ns
+            logger.error("Failed to reload changed model file (retrying once it changes again): %s", error)
+        else:
+            failed_mtime_ns = None
+            logger.info("Reloaded model after the model file changed")
+
+_model_watcher: Optional[asyncio.Task] = None
+
+# Prediction requests are decoded and validated by msgspec straight from the body
+predict_decoder = msgspec.json.Decoder(PredictRequest, strict=False)
+
+# The predict endpoint reads the raw body, so its request schema is generated by
+# msgspec and added to the OpenAPI document by hand
+(predict_request_schema,), msgspec_components = msgspec.json.schema_components(
+    [PredictRequest], ref_template="#/components/schemas/{name}"
+)
+_fastapi_openapi = app.openapi
+
+def openapi() -> dict:
+    """OpenAPI schema including the msgspec request components"""
+    schema = _fastapi_openapi()
+    schema.setdefault('components', {}).setdefault('schemas', {}).update(msgspec_components)
+    return schema
+
+app.openapi = openapi
+
+VALIDATION_PATH = re.compile(r"\.(\w+)|\[(\d+)\]")
+
+def validation_error_detail(error: msgspec.ValidationError) -> list:
+    """Shape a msgspec validation error like FastAPI's 422 detail ({loc, msg, type} entries)"""
+    msg, _, path = str(error).partition(" - at `")
+    loc = ["body"] + [
+        name if name else int(index)
+        for name, index in VALIDATION_PATH.findall(path.rstrip("`"))
+    ]
+    return [{"loc": loc, "msg": msg, "type": "value_error"}]
+
+def candidate_columns(candidates: list) -> dict:
+    """Fill one typed array per feature from the decoded candidates in a single pass"""
+    n = len(candidates)
+    distance_m = np.empty(n, dtype=np.float32)
+    distance_cat = np.empty(n, dtype=np.int8)
+    past_perf = np.empty(n, dtype=np.float32)
+    fault_history = np.empty(n, dtype=np.int64)
+    fatigue_h = np.empty(n, dtype=np.float32)
+    fault_severity = np.empty(n, dtype=np.int8)
+    for i, c in enumerate(candidates):
+        distance_m[i] = c.distance_m
+        distance_cat[i] = c.distance_cat
+        past_perf[i] = c.past_perf
+        fault_history[i] = c.fault_history
+        fatigue_h[i] = c.fatigue_h
+        fault_severity[i] = c.fault_severity
+    return {
+        'distance_m': distance_m,
+        'distance_cat': distance_cat,
+        'past_perf': past_perf,
+        'fault_history': fault_history,
+        'fatigue_h': fatigue_h,
+        'fault_severity': fault_severity,
+    }
+
 @app.on_event("startup")
 async def startup_event():
     """Startup event - model should already be loaded"""
@@ -71,6 +172,17 @@ async def startup_event():
             logger.info("Model loaded successfully on startup")
         else:
             logger.error("Failed to load model on startup. Check model file path and permissions.")
+    
+    global _model_watcher
+    if MODEL_RELOAD_INTERVAL > 0:
+        _model_watcher = asyncio.create_task(watch_model_file())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Shutdown event - stop the model watcher and the training worker"""
+    if _model_watcher is not None:
+        _model_watcher.cancel()
+    training_service.shutdown()
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -81,89 +193,117 @@ async def root():
         "status": "running"
     }
 
-@app.get("/api/health", response_model=HealthResponse, tags=["Health"])
+@app.get("/api/health", responses={200: {"model": HealthResponse}}, tags=["Health"])
 async def health_check():
     """Health check endpoint"""
     try:
         model_info = model.get_info()
-        return HealthResponse(
-            status="healthy",
-            model_loaded=model_info.get('loaded', False),
-            model_features=model_info.get('n_features', None),
-            error=model_info.get('error', None)
-        )
+        return {
+            "status": "healthy",
+            "model_loaded": model_info.get('loaded', False),
+            "model_features": model_info.get('n_features', None),
+            "error": model_info.get('error', None)
+        }
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        return HealthResponse(
-            status="unhealthy",
-            model_loaded=False,
-            error=str(e)
-        )
+        logger.error("Health check failed: %s", e)
+        return {
+            "status": "unhealthy",
+            "model_loaded": False,
+            "model_features": None,
+            "error": str(e)
+        }
 
-@app.get("/api/model/info", response_model=ModelInfoResponse, tags=["Model"])
+@app.get("/api/model/info", responses={200: {"model": ModelInfoResponse}}, tags=["Model"])
 async def get_model_info():
     """Get model information"""
     try:
-        info = model.get_info()
-        return ModelInfoResponse(**info)
+        return model.get_info()
     except Exception as e:
-        logger.error(f"Error getting model info: {e}")
+        logger.error("Error getting model info: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
-@app.post("/api/predict", response_model=PredictResponse, tags=["Prediction"])
-async def predict(request: PredictRequest):
+@app.post(
+    "/api/predict",
+    responses={200: {"model": PredictResponse}},
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": predict_request_schema}},
+            "required": True
+        }
+    },
+    tags=["Prediction"]
+)
+async def predict(request: Request):
     """
     Predict best vehicle from candidates
     
     Returns the index of the best candidate and scores for all candidates.
     """
     try:
-        # Convert Pydantic models to dicts
-        candidates = [candidate.dict() for candidate in request.candidates]
+        payload = predict_decoder.decode(await request.body())
+    except msgspec.ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=validation_error_detail(e)
+        )
+    except msgspec.DecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid JSON body: {e}"
+        )
+
+    try:
+        candidates = payload.candidates
         
         # Get predictions
-        best_idx, scores, predictions = model.predict(candidates)
-        
-        # Convert predictions to response format
-        prediction_results = [
-            PredictionResult(**pred) for pred in predictions
-        ]
+        best_idx, scores = model.predict(candidate_columns(candidates))
+        scores = [round(score, 2) for score in scores]
         
-        return PredictResponse(
-            best_index=best_idx,
-            scores=[round(score, 2) for score in scores],
-            predictions=prediction_results
-        )
+        return ORJSONResponse({
+            "best_index": best_idx,
+            "scores": scores,
+            "predictions": [
+                {"index": i, "score": score, "features": msgspec.structs.asdict(candidate)}
+                for i, (score, candidate) in enumerate(zip(scores, candidates))
+            ]
+        })
         
     except ValueError as e:
-        logger.error(f"Validation error in prediction: {e}")
+        logger.error("Validation error in prediction: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except RuntimeError as e:
-        logger.error(f"Model error in prediction: {e}")
+        logger.error("Model error in prediction: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Model not available: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error in prediction: {e}")
+        logger.error("Unexpected error in prediction: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Prediction failed: {str(e)}"
         )
 
-@app.post("/api/train", response_model=TrainResponse, tags=["Training"])
+@app.post(
+    "/api/train",
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={202: {"model": TrainJobResponse}},
+    tags=["Training"]
+)
 async def train(request: TrainRequest):
     """
-    Train a new model
+    Start training a new model
     
-    This will regenerate the model with the specified parameters.
-    Note: Training may take some time depending on n_samples.
+    This will regenerate the model with the specified parameters. Training runs
+    in a separate worker process; the job record is returned immediately and
+    its progress and metrics are polled from /api/train/{job_id}. The model is
+    reloaded automatically when the job completes.
     """
     if training_service.is_training():
         raise HTTPException(
@@ -172,37 +312,48 @@ async def train(request: TrainRequest):
         )
     
     try:
-        logger.info(f"Training request received: n_samples={request.n_samples}, seed={request.random_seed}")
+        logger.info(
+            "Training request received: n_samples=%s, seed=%s",
+            request.n_samples, request.random_seed
+        )
         
-        result = training_service.train(
+        return training_service.submit(
             n_samples=request.n_samples,
-            random_seed=request.random_seed
+            random_seed=request.random_seed,
+            model_type=request.model_type,
+            on_success=reload_model
         )
         
-        if result['success']:
-            # Reset and reload model after training
-            global model
-            model = get_model(str(MODEL_PATH) if MODEL_PATH else None, reset=True)
-            model.load(force_reload=True)
-            
-            return TrainResponse(**result)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=result.get('error', 'Training failed')
-            )
-            
-    except HTTPException:
-        raise
     except Exception as e:
-        logger.error(f"Training error: {e}")
+        logger.error("Training error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Training failed: {str(e)}"
         )
 
+@app.get("/api/train/{job_id}", responses={200: {"model": TrainJobResponse}}, tags=["Training"])
+async def get_training_job(job_id: str):
+    """Get the status of a training job (metrics are in result once it completes)"""
+    job = training_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Training job not found: {job_id}"
+        )
+    return job
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv('PORT', 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Predictions are CPU-bound, so run one worker per core by default;
+    # each worker loads its own model and follows retrains via watch_model_file
+    workers = int(os.getenv('WEB_CONCURRENCY', os.cpu_count() or 1))
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools"
+    )
 
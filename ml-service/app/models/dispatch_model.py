@@ -0,0 +1,226 @@
+"""
+Dispatch Model
+Handles model loading and prediction
+"""
+
+import os
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from app.models.rule_scorer import RuleBasedScorer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = Path(__file__).parent.parent.parent / 'models' / 'dispatch_ml_model.pkl'
+
+# Max cached candidate scores (0 disables the cache)
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 8192))
+
+# Rounding steps applied to continuous features before they are used as cache keys
+CACHE_QUANTIZATION = {
+    'distance_m': 50.0,
+    'past_perf': 0.1,
+    'fatigue_h': 0.1,
+}
+
+class DispatchModel:
+    """Wrapper around the trained dispatch model"""
+
+    def __init__(self, model_path: str = None):
+        self.model_path = Path(model_path) if model_path else DEFAULT_MODEL_PATH
+        self.model = None
+        self.features: Optional[List[str]] = None
+        self.model_data: Optional[dict] = None
+        self.error: Optional[str] = None
+        self._loaded_mtime_ns: Optional[int] = None
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    def load(self, force_reload: bool = False) -> bool:
+        """
+        Load model from disk
+
+        Args:
+            force_reload: Reload even if a model is already loaded
+
+        Returns:
+            True if the model is loaded
+        """
+        if self.model is not None and not force_reload:
+            return True
+
+        path = str(self.model_path)
+        if not Path(path).exists():
+            self.error = f"Model file not found: {path}"
+            logger.warning(self.error)
+            return False
+
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            # Arrays are paged in from the file on demand instead of being copied to the heap.
+            # The mapping is read-only and backed by the page cache, so every worker that
+            # loads the same file shares one physical copy of the model arrays.
+            model_data = joblib.load(path, mmap_mode='r')
+            self.model = model_data['model']
+            self.features = list(model_data['features'])
+            self.model_data = model_data
+            self.error = None
+            self._loaded_mtime_ns = mtime_ns
+            self._cache.clear()
+            logger.info("Model loaded from %s", path)
+            return True
+        except Exception as e:
+            self.model = None
+            self.error = f"Failed to load model: {e}"
+            logger.error(self.error)
+            return False
+
+    def is_loaded(self) -> bool:
+        """Check if model is loaded"""
+        return self.model is not None
+
+    def file_mtime_ns(self) -> Optional[int]:
+        """Modification time of the model file (None if it does not exist)"""
+        try:
+            return os.stat(str(self.model_path)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def is_stale(self) -> bool:
+        """Check if the model file was replaced (e.g. retrained by another worker) since it was loaded"""
+        mtime_ns = self.file_mtime_ns()
+        return mtime_ns is not None and mtime_ns != self._loaded_mtime_ns
+
+    def get_info(self) -> dict:
+        """Get model information"""
+        if not self.is_loaded():
+            return {
+                'loaded': False,
+                'model_path': str(self.model_path),
+                'error': self.error or 'Model not loaded'
+            }
+
+        return {
+            'loaded': True,
+            'features': self.features,
+            'n_features': len(self.features),
+            'model_type': type(self.model).__name__,
+            'model_info': {
+                key: value for key, value in self.model_data.items()
+                if key not in ('model', 'features')
+            },
+            'model_path': str(self.model_path),
+            'mapped_bytes': self._mapped_bytes(),
+            'prediction_cache': {
+                'enabled': self._cache_enabled(),
+                'size': len(self._cache),
+                'max_size': PREDICTION_CACHE_SIZE,
+                'hits': self._cache_hits,
+                'misses': self._cache_misses
+            },
+            'error': None
+        }
+
+    def _mapped_bytes(self) -> int:
+        """Size of the model arrays served straight from the memory-mapped model file"""
+        return sum(
+            value.nbytes for value in vars(self.model).values()
+            if isinstance(value, np.memmap)
+        )
+
+    def _cache_enabled(self) -> bool:
+        """Only cache models that are expensive to evaluate (the rule scorer is cheaper than a lookup)"""
+        return PREDICTION_CACHE_SIZE > 0 and not isinstance(self.model, RuleBasedScorer)
+
+    def predict(self, columns: Dict[str, np.ndarray]) -> Tuple[int, List[float]]:
+        """
+        Score candidates and pick the best one
+
+        Args:
+            columns: Feature name -> array of values, one entry per candidate
+
+        Returns:
+            Tuple of (best index, scores)
+        """
+        if not self.is_loaded() and not self.load():
+            raise RuntimeError(self.error or 'Model not loaded')
+
+        missing = [f for f in self.features if f not in columns]
+        if missing:
+            raise ValueError(f"Missing features: {missing}")
+
+        if len(columns[self.features[0]]) == 0:
+            raise ValueError("No candidates provided")
+
+        if self._cache_enabled():
+            scores = self._predict_cached(columns)
+        else:
+            scores = self._predict_batch(columns)
+        best_idx = int(np.argmax(scores))
+
+        return best_idx, scores.tolist()
+
+    def _predict_batch(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Run the model over all candidates in a single predict call"""
+        n = len(columns[self.features[0]])
+        X = np.empty((n, len(self.features)), dtype=np.float32)
+        for j, f in enumerate(self.features):
+            X[:, j] = columns[f]
+        return np.asarray(self.model.predict(X), dtype=np.float64)
+
+    def _predict_cached(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Serve scores from a bounded LRU keyed on quantized features
+
+        Misses are scored in one batch on the quantized values, so a cached
+        score is always exactly what the model returns for its key.
+        """
+        quantized = {
+            f: np.round(columns[f] / CACHE_QUANTIZATION[f]) * CACHE_QUANTIZATION[f]
+            if f in CACHE_QUANTIZATION else columns[f]
+            for f in self.features
+        }
+        keys = list(zip(*(quantized[f].tolist() for f in self.features)))
+
+        scores = np.empty(len(keys), dtype=np.float64)
+        missed = []
+        for i, key in enumerate(keys):
+            score = self._cache.get(key)
+            if score is None:
+                missed.append(i)
+            else:
+                self._cache.move_to_end(key)
+                scores[i] = score
+        self._cache_hits += len(keys) - len(missed)
+        self._cache_misses += len(missed)
+
+        if missed:
+            missed_scores = self._predict_batch({f: quantized[f][missed] for f in self.features})
+            for i, score in zip(missed, missed_scores.tolist()):
+                scores[i] = score
+                self._cache[keys[i]] = score
+            while len(self._cache) > PREDICTION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+        return scores
+
+# Global model instance
+_model: DispatchModel = None
+
+def get_model(model_path: str = None, reset: bool = False) -> DispatchModel:
+    """Get or create model instance"""
+    global _model
+    if _model is None or reset:
+        _model = DispatchModel(model_path)
+    return _model
+
+def set_model(model: DispatchModel):
+    """Replace the global model instance (e.g. with a freshly loaded one)"""
+    global _model
+    _model = model
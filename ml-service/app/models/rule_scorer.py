@@ -0,0 +1,158 @@
+"""
+Rule-Based Scorer
+Closed-form dispatch score used to label training data and to serve predictions
+"""
+
+from typing import List
+
+import numba
+import numpy as np
+from numba import prange
+
+# Below this many rows the parallel kernels spend more on waking the numba thread pool
+# than on scoring; predict requests (a few dozen candidates) always run serially, so
+# concurrent uvicorn workers do not each fan out across every core
+PARALLEL_MIN_ROWS = 50_000
+
+@numba.njit(inline='always', fastmath=True)
+def _rule_score_row(distance_m, past_perf, fault_history, fatigue_h, fault_severity,
+                    dist_max, fh_max):
+    """Weighted score of a single row"""
+    dist_score = min(max(1.0 - distance_m / (dist_max + 1e-6), 0.0), 1.0)
+    fh_score = min(max(fault_history / (fh_max + 1e-6), 0.0), 1.0)
+    fatigue_score = min(max(1.0 - fatigue_h / 24.0, 0.0), 1.0)
+    severity_score = fault_severity / 3.0      # 1/3, 2/3, 1
+    perf_score = past_perf / 10.0              # 0..1
+    return (
+        0.45 * dist_score +
+        0.25 * fh_score +
+        0.15 * fatigue_score +
+        0.05 * severity_score +
+        0.10 * perf_score
+    )
+
+@numba.njit(fastmath=True, cache=True)
+def _rule_score_kernel(distance_m, past_perf, fault_history, fatigue_h, fault_severity,
+                       dist_max, fh_max, out):
+    """Fused weighted score: one pass over the feature columns, one write per row"""
+    for i in range(distance_m.shape[0]):
+        out[i] = _rule_score_row(
+            distance_m[i], past_perf[i], fault_history[i], fatigue_h[i], fault_severity[i],
+            dist_max, fh_max
+        )
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def _rule_score_kernel_parallel(distance_m, past_perf, fault_history, fatigue_h, fault_severity,
+                                dist_max, fh_max, out):
+    """_rule_score_kernel with rows split across the numba thread pool"""
+    for i in prange(distance_m.shape[0]):
+        out[i] = _rule_score_row(
+            distance_m[i], past_perf[i], fault_history[i], fatigue_h[i], fault_severity[i],
+            dist_max, fh_max
+        )
+
+@numba.njit(fastmath=True, cache=True)
+def _normalize_kernel(scores, score_min, score_max):
+    """Rescale raw scores in place so the training range maps to 0-100"""
+    scale = 100.0 / (score_max - score_min)
+    for i in range(scores.shape[0]):
+        scores[i] = (scores[i] - score_min) * scale
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def _normalize_kernel_parallel(scores, score_min, score_max):
+    """_normalize_kernel with rows split across the numba thread pool"""
+    scale = 100.0 / (score_max - score_min)
+    for i in prange(scores.shape[0]):
+        scores[i] = (scores[i] - score_min) * scale
+
+def rule_score(distance_m, past_perf, fault_history, fatigue_h, fault_severity,
+               dist_max: float, fh_max: float) -> np.ndarray:
+    """
+    Weighted rule-based dispatch score (0..1) from raw feature arrays
+
+    Weights: distance=0.45, fault_history=0.25, fatigue=0.15, severity=0.05, perf=0.10
+    """
+    distance_m = np.asarray(distance_m)
+    out = np.empty(distance_m.shape[0], dtype=np.float64)
+    kernel = _rule_score_kernel_parallel if out.shape[0] >= PARALLEL_MIN_ROWS else _rule_score_kernel
+    kernel(
+        distance_m, np.asarray(past_perf), np.asarray(fault_history),
+        np.asarray(fatigue_h), np.asarray(fault_severity),
+        float(dist_max), float(fh_max), out
+    )
+    return out
+
+def normalize(scores: np.ndarray, score_min: float, score_max: float):
+    """
+    Rescale raw scores (float64) in place so the training range maps to 0-100
+
+    Not clamped: candidates stronger (or weaker) than anything seen in training
+    score above 100 (or below 0), so their ranking is kept.
+    """
+    kernel = _normalize_kernel_parallel if scores.shape[0] >= PARALLEL_MIN_ROWS else _normalize_kernel
+    kernel(scores, score_min, score_max)
+
+def _warm_up():
+    """Compile the kernels for the column layouts used by training and serving"""
+    f32 = np.zeros(2, dtype=np.float32)
+    i8 = np.zeros(2, dtype=np.int8)
+    out = np.empty(2, dtype=np.float64)
+    # Training: float32 / int8 DataFrame columns (read-only views under pandas copy-on-write)
+    f32.flags.writeable = False
+    i8.flags.writeable = False
+    for kernel in (_rule_score_kernel, _rule_score_kernel_parallel):
+        kernel(f32, f32, i8, f32, i8, 1.0, 1.0, out)
+    # Serving: columns of the float32 candidate matrix (strided, or contiguous for one candidate)
+    for n in (2, 1):
+        cols = np.zeros((n, 5), dtype=np.float32)
+        _rule_score_kernel(cols[:, 0], cols[:, 1], cols[:, 2], cols[:, 3], cols[:, 4], 1.0, 1.0, out[:n])
+    _normalize_kernel(out, 0.0, 1.0)
+    _normalize_kernel_parallel(out, 0.0, 1.0)
+
+_warm_up()
+
+class RuleBasedScorer:
+    """
+    Closed-form dispatch scorer
+
+    Holds the normalization constants taken from the training data and exposes
+    the same predict(X) interface as an sklearn regressor, so it can be stored
+    and served in place of a fitted model.
+    """
+
+    def __init__(self, features: List[str], dist_max: float, fh_max: float,
+                 score_min: float, score_max: float):
+        self.features = list(features)
+        self.dist_max = float(dist_max)
+        self.fh_max = float(fh_max)
+        self.score_min = float(score_min)
+        self.score_max = float(score_max)
+
+    @classmethod
+    def fit(cls, df, features: List[str]) -> 'RuleBasedScorer':
+        """Take normalization constants from a DataFrame of raw features"""
+        dist_max = float(df['distance_m'].max())
+        fh_max = float(df['fault_history'].max())
+        raw = rule_score(
+            df['distance_m'], df['past_perf'], df['fault_history'],
+            df['fatigue_h'], df['fault_severity'], dist_max, fh_max
+        )
+        return cls(features, dist_max, fh_max, float(raw.min()), float(raw.max()))
+
+    def score(self, distance_m, past_perf, fault_history, fatigue_h, fault_severity) -> np.ndarray:
+        """Dispatch score (0-100 over the training range) from raw feature arrays"""
+        scores = rule_score(
+            distance_m, past_perf, fault_history, fatigue_h, fault_severity,
+            self.dist_max, self.fh_max
+        )
+        normalize(scores, self.score_min, self.score_max)
+        return scores
+
+    def predict(self, X) -> np.ndarray:
+        """Score a (n_samples, n_features) matrix laid out in self.features order"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        col = {name: X[:, i] for i, name in enumerate(self.features)}
+        return self.score(
+            col['distance_m'], col['past_perf'], col['fault_history'],
+            col['fatigue_h'], col['fault_severity']
+        )
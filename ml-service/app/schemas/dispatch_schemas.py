@@ -1,22 +1,25 @@
 """
 Pydantic schemas for API requests and responses
+(msgspec structs for the prediction request)
 """
 
-from typing import List, Optional
+from typing import Annotated, List, Literal, Optional
+
+import msgspec
 from pydantic import BaseModel, Field
 
-class CandidateRequest(BaseModel):
-    """Single candidate vehicle for dispatch"""
-    distance_m: float = Field(..., description="Distance to fault in meters", ge=0)
-    distance_cat: int = Field(..., description="Distance category (0, 1, or 2)", ge=0, le=2)
-    past_perf: float = Field(..., description="Past performance score (1-10)", ge=1, le=10)
-    fault_history: int = Field(..., description="Count of similar faults handled", ge=0)
-    fatigue_h: float = Field(..., description="Fatigue in hours (0-24)", ge=0, le=24)
-    fault_severity: int = Field(..., description="Fault severity (1=Low, 2=Medium, 3=High)", ge=1, le=3)
+class CandidateRequest(msgspec.Struct):
+    """Single candidate vehicle for dispatch (decoded with msgspec on the predict hot path)"""
+    distance_m: Annotated[float, msgspec.Meta(ge=0, description="Distance to fault in meters")]
+    distance_cat: Annotated[int, msgspec.Meta(ge=0, le=2, description="Distance category (0, 1, or 2)")]
+    past_perf: Annotated[float, msgspec.Meta(ge=1, le=10, description="Past performance score (1-10)")]
+    fault_history: Annotated[int, msgspec.Meta(ge=0, le=2**63 - 1, description="Count of similar faults handled")]
+    fatigue_h: Annotated[float, msgspec.Meta(ge=0, le=24, description="Fatigue in hours (0-24)")]
+    fault_severity: Annotated[int, msgspec.Meta(ge=1, le=3, description="Fault severity (1=Low, 2=Medium, 3=High)")]
 
-class PredictRequest(BaseModel):
+class PredictRequest(msgspec.Struct):
     """Request for prediction endpoint"""
-    candidates: List[CandidateRequest] = Field(..., description="List of candidate vehicles", min_items=1)
+    candidates: Annotated[List[CandidateRequest], msgspec.Meta(min_length=1, description="List of candidate vehicles")]
 
 class PredictionResult(BaseModel):
     """Single prediction result"""
@@ -34,6 +37,7 @@ class TrainRequest(BaseModel):
     """Request for training endpoint"""
     n_samples: Optional[int] = Field(3000, description="Number of synthetic samples", ge=100, le=100000)
     random_seed: Optional[int] = Field(42, description="Random seed for reproducibility")
+    model_type: Literal['rule_based', 'random_forest'] = Field('rule_based', description="Model to build")
 
 class TrainResponse(BaseModel):
     """Response from training endpoint"""
@@ -42,10 +46,22 @@ class TrainResponse(BaseModel):
     r2: Optional[float] = None
     model_path: Optional[str] = None
     features: Optional[List[str]] = None
+    model_type: Optional[str] = None
     n_samples: Optional[int] = None
     random_seed: Optional[int] = None
     error: Optional[str] = None
 
+class TrainJobResponse(BaseModel):
+    """Training job status (result is set once the job completes or fails)"""
+    job_id: str
+    status: Literal['pending', 'running', 'completed', 'failed']
+    n_samples: int
+    random_seed: Optional[int] = None
+    model_type: str
+    created_at: float
+    updated_at: float
+    result: Optional[TrainResponse] = None
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
@@ -61,5 +77,7 @@ class ModelInfoResponse(BaseModel):
     model_type: Optional[str] = None
     model_info: Optional[dict] = None
     model_path: Optional[str] = None
+    mapped_bytes: Optional[int] = None
+    prediction_cache: Optional[dict] = None
     error: Optional[str] = None
 
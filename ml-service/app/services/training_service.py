@@ -3,85 +3,205 @@ Training Service
 Handles model training logic
 """
 
-import sys
-from pathlib import Path
+import os
+import re
+import time
+import uuid
+import asyncio
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Optional
+
+import orjson
+
+from app.models.dispatch_model import DEFAULT_MODEL_PATH
+from app.training.train_model import train_model
 
 logger = logging.getLogger(__name__)
 
-# Lazy import to avoid import-time errors
-_train_model = None
+# Finished job records kept on disk for status polling
+MAX_JOB_RECORDS = 50
 
-def _get_train_model():
-    """Lazy import of train_model function"""
-    global _train_model
-    if _train_model is None:
-        # Add scripts directory to path
-        scripts_path = Path(__file__).parent.parent.parent / 'scripts'
-        if str(scripts_path) not in sys.path:
-            sys.path.insert(0, str(scripts_path))
-        from train_model import train_model as tm
-        _train_model = tm
-    return _train_model
+JOB_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+def run_training(model_path: str = None, n_samples: int = 3000, random_seed: int = 42,
+                 model_type: str = 'rule_based') -> dict:
+    """
+    Train a new model (runs in the training worker process)
+    
+    Logging is not configured in the worker, so outcomes are reported through
+    the returned dictionary and logged by the server process.
+    
+    Args:
+        model_path: Where to save the model
+        n_samples: Number of synthetic samples
+        random_seed: Random seed for reproducibility
+        model_type: 'rule_based' or 'random_forest'
+        
+    Returns:
+        Training results dictionary
+    """
+    try:
+        result = train_model(
+            n_samples=n_samples,
+            random_seed=random_seed,
+            model_path=model_path,
+            model_type=model_type
+        )
+        
+        return {
+            'success': True,
+            'mae': result['mae'],
+            'r2': result['r2'],
+            'model_path': result['model_path'],
+            'features': result['features'],
+            'model_type': result['model_type'],
+            'n_samples': n_samples,
+            'random_seed': random_seed
+        }
+        
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
 
 class TrainingService:
     """Service for training dispatch models"""
     
     def __init__(self, model_path: str = None):
         self.model_path = model_path
+        # Job records live next to the model so any worker can answer status polls
+        self.jobs_dir = Path(model_path).parent / 'jobs' if model_path else DEFAULT_MODEL_PATH.parent / 'jobs'
         self._training_in_progress = False
+        self._executor: ProcessPoolExecutor = None
+        self._tasks: set = set()
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Lazily start the single training worker process"""
+        if self._executor is None:
+            # spawn: the worker must not inherit the server's event loop and threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
     
-    def train(self, n_samples: int = 3000, random_seed: int = 42) -> dict:
+    def submit(self, n_samples: int = 3000, random_seed: int = 42, model_type: str = 'rule_based',
+               on_success: Callable[[], Optional[str]] = None) -> dict:
         """
-        Train a new model
+        Start training in the worker process and return the job record immediately
         
         Args:
             n_samples: Number of synthetic samples
             random_seed: Random seed for reproducibility
+            model_type: 'rule_based' or 'random_forest'
+            on_success: Called after a successful run (e.g. to reload the model);
+                returns an error message to mark the job failed
             
         Returns:
-            Training results dictionary
+            Job record (poll with get_job)
         """
         if self._training_in_progress:
             raise RuntimeError("Training already in progress")
         
+        # The flag is only read in this server process, which owns the worker
+        self._training_in_progress = True
         try:
-            self._training_in_progress = True
-            logger.info(f"Starting model training with {n_samples} samples")
-            
-            # Lazy import train_model function
-            train_model_func = _get_train_model()
-            
-            result = train_model_func(
-                n_samples=n_samples,
-                random_seed=random_seed,
-                model_path=self.model_path
-            )
-            
-            logger.info(f"Training completed. MAE: {result['mae']:.3f}, R2: {result['r2']:.3f}")
-            
-            return {
-                'success': True,
-                'mae': result['mae'],
-                'r2': result['r2'],
-                'model_path': result['model_path'],
-                'features': result['features'],
+            now = time.time()
+            job = {
+                'job_id': uuid.uuid4().hex,
+                'status': 'pending',
                 'n_samples': n_samples,
-                'random_seed': random_seed
+                'random_seed': random_seed,
+                'model_type': model_type,
+                'created_at': now,
+                'updated_at': now,
+                'result': None
             }
-            
+            self._save_job(job)
+            task = asyncio.get_running_loop().create_task(self._run_job(job, on_success))
+        except Exception:
+            self._training_in_progress = False
+            raise
+        
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+    
+    async def _run_job(self, job: dict, on_success: Callable[[], Optional[str]] = None):
+        """Run a submitted job to completion and record its outcome"""
+        try:
+            self._update_job(job, status='running')
+            logger.info(
+                "Starting training job %s: %s model, %d samples",
+                job['job_id'], job['model_type'], job['n_samples']
+            )
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._get_executor(), run_training,
+                self.model_path, job['n_samples'], job['random_seed'], job['model_type']
+            )
+            if result['success'] and on_success is not None:
+                error = on_success()
+                if error:
+                    result = {'success': False, 'error': f"Model trained but failed to reload: {error}"}
+        except BrokenProcessPool as e:
+            # The worker died (e.g. OOM-killed); drop the pool so the next job starts a fresh one
+            self.shutdown()
+            result = {'success': False, 'error': f"Training worker terminated abruptly: {e}"}
         except Exception as e:
-            logger.error(f"Training failed: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            result = {'success': False, 'error': str(e)}
         finally:
             self._training_in_progress = False
+        
+        if result['success']:
+            logger.info(
+                "Training job %s completed. MAE: %.3f, R2: %.3f",
+                job['job_id'], result['mae'], result['r2']
+            )
+        else:
+            logger.error("Training job %s failed: %s", job['job_id'], result['error'])
+        self._update_job(job, status='completed' if result['success'] else 'failed', result=result)
+    
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Get a job record by ID (None if unknown)"""
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        try:
+            return orjson.loads((self.jobs_dir / f"{job_id}.json").read_bytes())
+        except FileNotFoundError:
+            return None
+    
+    def _update_job(self, job: dict, **changes):
+        job.update(changes, updated_at=time.time())
+        self._save_job(job)
+    
+    def _save_job(self, job: dict):
+        """Write a job record atomically, keeping only the most recent MAX_JOB_RECORDS"""
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        path = self.jobs_dir / f"{job['job_id']}.json"
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_bytes(orjson.dumps(job))
+        os.replace(tmp_path, path)
+        
+        if job['status'] == 'pending':
+            records = sorted(self.jobs_dir.glob('*.json'), key=lambda p: p.stat().st_mtime)
+            for old in records[:-MAX_JOB_RECORDS]:
+                old.unlink(missing_ok=True)
     
     def is_training(self) -> bool:
         """Check if training is in progress"""
         return self._training_in_progress
+    
+    def shutdown(self):
+        """Stop the training worker process"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
 # Global training service instance
 _training_service: TrainingService = None
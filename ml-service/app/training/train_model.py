@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Training for Dispatch ML Model
+Generates synthetic data and builds the dispatch model for vehicle dispatch decisions:
+either the closed-form rule-based scorer (default) or a RandomForest regressor.
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+import joblib
+
+from app.models.dispatch_model import DEFAULT_MODEL_PATH
+from app.models.quantized_forest import QuantizedForest
+from app.models.rule_scorer import RuleBasedScorer
+
+FEATURE_COLUMNS = ['distance_m', 'distance_cat', 'past_perf', 'fault_history',
+                   'fatigue_h', 'fault_severity']
+
+MODEL_TYPES = ('rule_based', 'random_forest')
+
+# Distance category edges in meters: <1000 -> 0, <5000 -> 1, otherwise 2
+DISTANCE_CAT_BINS = np.array([1000.0, 5000.0])
+
+def generate_synthetic_data(n=3000, random_seed=42):
+    """Generate synthetic dispatch data"""
+    rng = np.random.default_rng(random_seed)
+    
+    # Continuous features are drawn straight into float32 buffers
+    distance_m = np.empty(n, dtype=np.float32)
+    rng.standard_exponential(dtype=np.float32, out=distance_m)
+    distance_m *= 2000                                            # distance to fault (meters), scale 2000
+    
+    past_perf = np.empty(n, dtype=np.float32)
+    rng.standard_normal(dtype=np.float32, out=past_perf)
+    past_perf *= 1.5
+    past_perf += 7
+    np.clip(past_perf, 1, 10, out=past_perf)                      # team past performance (1-10)
+    
+    # Generate fault count (0-12 faults per day is realistic)
+    faults_today = rng.poisson(lam=3, size=n)  # Average 3 faults per day
+    
+    df = pd.DataFrame({
+        'distance_m': distance_m,
+        'past_perf': past_perf,
+        'fault_history': rng.poisson(1.0, n).astype(np.int8),      # similar faults handled (count)
+        'fatigue_h': np.clip(faults_today * 2, 0, 24).astype(np.float32),  # crew fatigue (hours) - converted from fault count
+        'fault_severity': rng.integers(1, 4, size=n, dtype=np.int8)       # 1=low,2=medium,3=high
+    })
+    
+    df['distance_cat'] = np.digitize(df['distance_m'].to_numpy(), bins=DISTANCE_CAT_BINS).astype(np.int8)
+    
+    return df
+
+def calculate_rule_based_score(df, scorer=None):
+    """Calculate rule-based dispatch scores (0-100), reusing a fitted scorer's constants if given"""
+    if scorer is None:
+        scorer = RuleBasedScorer.fit(df, FEATURE_COLUMNS)
+    return scorer.score(
+        df['distance_m'], df['past_perf'], df['fault_history'],
+        df['fatigue_h'], df['fault_severity']
+    )
+
+def shuffle_split(X, y, test_size=0.2, random_seed=42):
+    """Shuffle once, then slice contiguous train/test blocks"""
+    # Own stream: generate_synthetic_data already draws from default_rng(random_seed).
+    # A spawned child keeps the two independent and works for random_seed=None too
+    rng = np.random.default_rng(np.random.SeedSequence(random_seed).spawn(1)[0])
+    perm = rng.permutation(len(X))
+    X, y = X[perm], y[perm]
+    split = len(X) - int(np.ceil(len(X) * test_size))
+    return X[:split], X[split:], y[:split], y[split:]
+
+def train_model(n_samples=3000, random_seed=42, model_path=None, model_type='rule_based'):
+    """
+    Train the dispatch model
+
+    The target is the closed-form rule score, so 'rule_based' stores the scorer
+    itself (no fitting, exact predictions); 'random_forest' fits a regressor to it
+    for when features are added that the rule does not cover.
+    """
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"Unknown model type: {model_type} (expected one of {MODEL_TYPES})")
+
+    print(f"Generating {n_samples} synthetic records...")
+    df = generate_synthetic_data(n=n_samples, random_seed=random_seed)
+    
+    print("Calculating rule-based dispatch scores...")
+    # Normalization constants (distance / fault-history maxima, raw score range) are
+    # computed once here and reused for the labels, the rule-based model and the metadata
+    scorer = RuleBasedScorer.fit(df, FEATURE_COLUMNS)
+    df['dispatch_score'] = calculate_rule_based_score(df, scorer)
+    
+    # Prepare features and target
+    feature_columns = FEATURE_COLUMNS
+    # Plain float32 arrays: the tree splitter works in float32 (so fit makes no conversion
+    # copy) and the model is served with a float32 matrix without feature names.
+    # The target stays float64, which is what sklearn fits regressors on.
+    X = np.ascontiguousarray(df[feature_columns].to_numpy(dtype=np.float32))
+    y = df['dispatch_score'].to_numpy(dtype=np.float64)
+    
+    # Split data
+    X_train, X_test, y_train, y_test = shuffle_split(X, y, test_size=0.2, random_seed=random_seed)
+    
+    if model_type == 'rule_based':
+        print("Using rule-based scorer...")
+        ml_model = scorer
+    else:
+        print(f"Training model with {len(X_train)} samples...")
+        forest = RandomForestRegressor(n_estimators=200, random_state=random_seed, n_jobs=-1)
+        forest.fit(X_train, y_train)
+        # Saved and served as packed node arrays with int8 leaf scores
+        ml_model = QuantizedForest.from_forest(forest)
+        print(f"Quantized {ml_model.node_count} nodes "
+              f"(forest MAE before quantization: {mean_absolute_error(y_test, forest.predict(X_test)):.3f})")
+    
+    # Evaluate
+    preds = ml_model.predict(X_test)
+    mae = mean_absolute_error(y_test, preds)
+    r2 = r2_score(y_test, preds)
+    
+    print(f"\nModel Performance:")
+    print(f"  MAE: {mae:.3f}")
+    print(f"  R2:  {r2:.3f}")
+    
+    # Save model
+    if model_path is None:
+        model_path = DEFAULT_MODEL_PATH
+    else:
+        model_path = Path(model_path)
+    
+    # Ensure directory exists
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    model_data = {
+        'model': ml_model,
+        'features': feature_columns,
+        'model_type': model_type,
+        'random_seed': random_seed,
+        'training_samples': len(X_train),
+        'test_samples': len(X_test),
+        'mae': float(mae),
+        'r2': float(r2),
+        'normalization': {
+            'dist_max': scorer.dist_max,
+            'fh_max': scorer.fh_max,
+            'score_min': scorer.score_min,
+            'score_max': scorer.score_max
+        }
+    }
+    if model_type == 'random_forest':
+        model_data['n_estimators'] = ml_model.n_estimators
+        model_data['n_nodes'] = ml_model.node_count
+    
+    # Uncompressed, protocol 5: arrays are written raw so the service can memory-map them on load.
+    # Written to a temp file and renamed over the old one, so running workers that have the
+    # old file mapped keep a valid copy and never load a partially written model.
+    tmp_path = model_path.with_name(f".{model_path.name}.{os.getpid()}.tmp")
+    joblib.dump(model_data, tmp_path, compress=0, protocol=5)
+    os.replace(tmp_path, model_path)
+    print(f"\nModel saved to: {model_path}")
+    
+    return {
+        'model': ml_model,
+        'features': feature_columns,
+        'model_type': model_type,
+        'mae': float(mae),
+        'r2': float(r2),
+        'model_path': str(model_path)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Train Dispatch ML Model')
+    parser.add_argument('--n-samples', type=int, default=3000,
+                       help='Number of synthetic samples to generate (default: 3000)')
+    parser.add_argument('--random-seed', type=int, default=42,
+                       help='Random seed for reproducibility (default: 42)')
+    parser.add_argument('--model-path', type=str, default=None,
+                       help='Path to save model (default: models/dispatch_ml_model.pkl)')
+    parser.add_argument('--model-type', choices=MODEL_TYPES, default='rule_based',
+                       help='Model to build (default: rule_based)')
+    
+    args = parser.parse_args()
+    
+    try:
+        result = train_model(
+            n_samples=args.n_samples,
+            random_seed=args.random_seed,
+            model_path=args.model_path,
+            model_type=args.model_type
+        )
+        print("\n✅ Training completed successfully!")
+        return 0
+    except Exception as e:
+        print(f"\n❌ Training failed: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
+
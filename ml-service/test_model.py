@@ -35,7 +35,7 @@ test_candidate = {
 
 import pandas as pd
 df_test = pd.DataFrame([test_candidate], columns=data['features'])
-prediction = model.predict(df_test)[0]
+prediction = model.predict(df_test.to_numpy(dtype='float32'))[0]
 
 print(f"\n🧪 Test Prediction:")
 print(f"  Input: {test_candidate}")